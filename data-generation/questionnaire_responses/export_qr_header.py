@@ -3,9 +3,10 @@
 export_qr_headers.py
 
 Connect to HAPI FHIR DB, execute the questionnaire header query,
-and save results to CSV for QR generation.
+and stream the results to CSV (server-side COPY) for QR generation.
 
-Loads DB_* credentials from a .env file if present.
+Loads DB_* credentials from a .env file if present. Set EXPORT_MODE=cursor
+to stream through a server-side cursor instead, for targets without COPY.
 """
 
 import csv
@@ -13,7 +14,7 @@ import os
 from pathlib import Path
 
 import psycopg2
-import psycopg2.extras
+import psycopg2.pool
 from dotenv import load_dotenv
 
 # ---- Load .env ----
@@ -28,6 +29,10 @@ DB_NAME = os.getenv("DB_NAME", "hapi")
 DB_USER = os.getenv("DB_USER", "hapi")
 DB_PASS = os.getenv("DB_PASS", "hapi")
 
+# ---- Export config ----
+EXPORT_MODE = os.getenv("EXPORT_MODE", "copy").lower()   # copy | cursor
+CURSOR_ITERSIZE = 10000                                  # rows per round-trip
+
 OUT_DIR = Path("./input")
 OUT_FILE = OUT_DIR / "QuestionnaireResponse-Header.csv"
 
@@ -87,7 +92,8 @@ SELECT
   CASE WHEN prac.prac_id IS NOT NULL
        THEN 'Practitioner/' || prac.prac_id
        ELSE NULL END        AS practitionerId,
-  COALESCE(enc_date.period_end, enc_date.period_start, NOW()) AS authored,
+  to_char(COALESCE(enc_date.period_end, enc_date.period_start, NOW()),
+          'YYYY-MM-DD"T"HH24:MI:SSTZH:TZM') AS authored,
   'Patient/' || pat.pat_id  AS src
 FROM enc
 JOIN enc_patient ON enc.res_id = enc_patient.enc_res_id
@@ -98,33 +104,85 @@ LEFT JOIN enc_date      ON enc.res_id = enc_date.enc_res_id
 ORDER BY patientId, encounterId;
 """
 
+# authored is rendered server-side as an RFC3339 FHIR dateTime, so COPY (and
+# the cursor path) emit ready-to-use strings; no psycopg2 datetime objects.
+COPY_SQL = f"COPY ({SQL.strip().rstrip(';')}) TO STDOUT WITH (FORMAT CSV, HEADER TRUE)"
+
+
+# Lazily created pool, so repeated main() calls from a batch pipeline reuse
+# an authenticated connection instead of reconnecting every time.
+_POOL = None
+
+
+def get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = psycopg2.pool.ThreadedConnectionPool(
+            1, 4,
+            host=DB_HOST, port=DB_PORT,
+            dbname=DB_NAME, user=DB_USER, password=DB_PASS
+        )
+    return _POOL
+
+
+def export_copy(conn, path: Path) -> int:
+    """Stream CSV bytes straight from the server into ``path``."""
+    cur = conn.cursor()
+    try:
+        with path.open("wb") as f:
+            cur.copy_expert(COPY_SQL, f)
+        return cur.rowcount
+    finally:
+        cur.close()
+
+
+def export_cursor(conn, path: Path) -> int:
+    """Iterate a named (server-side) cursor so only itersize rows are held."""
+    cur = conn.cursor(name="qr_hdr")   # plain tuples; csv.writer only needs positions
+    cur.itersize = CURSOR_ITERSIZE
+    try:
+        cur.execute(SQL)
+        rows = iter(cur)
+        first = next(rows, None)   # named cursors expose description after a fetch
+        if first is None:
+            return 0
+        headers = [desc.name for desc in cur.description]
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerow(first)
+            writer.writerows(rows)
+        return cur.rownumber
+    finally:
+        cur.close()
+
+
 def main():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    conn = psycopg2.connect(
-        host=DB_HOST, port=DB_PORT,
-        dbname=DB_NAME, user=DB_USER, password=DB_PASS
-    )
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    cur.execute(SQL)
-    rows = cur.fetchall()
-
-    if not rows:
+    # Export into a temp file next to OUT_FILE and swap it in only on success,
+    # so a failed query or a broken stream keeps the last good export intact.
+    tmp = OUT_FILE.with_name(OUT_FILE.name + ".part")
+
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        n_rows = export_cursor(conn, tmp) if EXPORT_MODE == "cursor" else export_copy(conn, tmp)
+        conn.rollback()   # end the read transaction before the conn is reused
+    except Exception:
+        pool.putconn(conn, close=True)
+        tmp.unlink(missing_ok=True)
+        raise
+    else:
+        pool.putconn(conn)
+
+    if n_rows <= 0:
+        tmp.unlink(missing_ok=True)
         print("No results found.")
         return
 
-    headers = [desc.name for desc in cur.description]
-
-    with OUT_FILE.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        for row in rows:
-            writer.writerow(row)
-
-    print(f"Wrote {len(rows)} rows to {OUT_FILE}")
-
-    cur.close()
-    conn.close()
+    os.replace(tmp, OUT_FILE)
+    print(f"Wrote {n_rows} rows to {OUT_FILE}")
 
 
 if __name__ == "__main__":
@@ -20,6 +20,15 @@ Usage examples:
   # Override chunk size (files capped at N resources each)
   python qr_bundle_maker.py --mode nreq --csv QuestionnaireResponse-Header.csv --out output --chunk-size 250
 
+  # Skip the generated text.div narrative (smaller bundles for bulk ingestion)
+  python qr_bundle_maker.py --mode nreq --csv QuestionnaireResponse-Header.csv --out output --no-narrative
+
+  # NDJSON (one bare QuestionnaireResponse per line) for bulk $import
+  python qr_bundle_maker.py --mode nreq --csv QuestionnaireResponse-Header.csv --out output --ndjson
+
+  # Large CSVs: generate and write chunks in 4 processes
+  python qr_bundle_maker.py --mode nreq --csv QuestionnaireResponse-Header.csv --out output --seed 42 --workers 4
+
   # Use a custom Questionnaire JSON
   python qr_bundle_maker.py --mode nreq --csv QuestionnaireResponse-Header.csv --out output \
       --questionnaire-file ./NREQ.json --questionnaire-url http://example.org/fhir/Questionnaire/NREQ
@@ -28,67 +37,132 @@ Usage examples:
 
 from __future__ import annotations
 import argparse
+import asyncio
 import csv
+import io
 import json
-import math
+import os
 import random
+import re
 import sys
-import uuid
+import threading
+from contextlib import contextmanager
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Any, Iterable, Optional, Tuple
+from typing import BinaryIO, Callable, DefaultDict, Dict, List, Any, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+try:
+    import orjson  # optional: C-accelerated JSON encoder/decoder
+except ImportError:
+    orjson = None
 
 # -----------------------------
 # Utilities (CSV, time, refs)
 # -----------------------------
 
-def detect_delimiter(csv_path: Path) -> str:
-    sample = csv_path.read_text(encoding="utf-8", errors="ignore")
+def sniff_delimiter(head: bytes) -> str:
+    """Pick the most frequent common delimiter in the first line of a byte sample."""
+    first_line = head.split(b"\n", 1)[0]
+    counts = {cand: first_line.count(cand.encode()) for cand in (",", ";", "\t", "|")}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else ","
+
+
+# Fast-path authored shapes: YYYY-M[M]-D[D], optionally followed by
+# [ T]H[H]:MM[:SS] and a UTC offset (Z, +HH:MM or +HHMM); single-digit fields
+# are accepted as strptime did. Naive values are taken as UTC.
+_DT_RE = re.compile(
+    r"^(\d{4})-(\d{1,2})-(\d{1,2})"
+    r"(?:[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?(Z|[+-]\d{2}:?\d{2})?)?$"
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_fhir_datetime(dt_str: str) -> Optional[str]:
+    """Normalize a non-empty authored string to RFC3339, or None if unparseable.
+
+    Pure per input, and authored values repeat heavily (same day, many
+    encounters), so results are memoized.
+    """
+    m = _DT_RE.match(dt_str)
+    if m:
+        y, mo, d, hh, mm, ss, tz = m.groups()
+        # The regex only checks shapes; timezone()/datetime() reject
+        # out-of-range values (month 13, Feb 30, hour 24, offsets >= 24h)
+        # like strptime did.
+        try:
+            if not tz or tz == "Z":
+                tzinfo = timezone.utc
+            else:
+                sign = -1 if tz[0] == "-" else 1
+                tzinfo = timezone(sign * timedelta(hours=int(tz[1:3]), minutes=int(tz[-2:])))
+            dt = datetime(int(y), int(mo), int(d), int(hh or 0), int(mm or 0), int(ss or 0), tzinfo=tzinfo)
+        except ValueError:
+            return None
+        return dt.isoformat()
+    # Other ISO 8601 shapes (fractional seconds, +HH offsets, ...): one
+    # C-level parse attempt instead of a list of strptime formats
     try:
-        sniffer = csv.Sniffer()
-        dialect = sniffer.sniff(sample.splitlines()[0] if sample else ",")
-        return dialect.delimiter
-    except Exception:
-        # Fallback: try common delimiters
-        for cand in [",", ";", "\t", "|"]:
-            if cand in sample.splitlines()[0]:
-                return cand
-        return ","
-
-
-def normalize_headers(row: Dict[str, Any]) -> Dict[str, Any]:
-    """Return a dict with case-insensitive keys while preserving values."""
-    return { (k or "").strip().lower(): v for k, v in row.items() }
+        dt = datetime.fromisoformat(dt_str.strip())
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.isoformat()
 
 
 def to_fhir_datetime(dt_str: Optional[str] = None) -> str:
     """Return an RFC3339 FHIR DateTime with offset; use now() if not provided."""
     if dt_str:
-        # Attempt several common formats
-        fmts = [
-            "%Y-%m-%d",
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%Y-%m-%d %H:%M:%S%z",
-        ]
-        for f in fmts:
-            try:
-                if "%z" in f:
-                    dt = datetime.strptime(dt_str, f)
-                else:
-                    dt = datetime.strptime(dt_str, f).replace(tzinfo=timezone.utc)
-                return dt.isoformat()
-            except Exception:
-                pass
-    # Fallback: now with local offset if available
+        parsed = _parse_fhir_datetime(dt_str)
+        if parsed is not None:
+            return parsed
+    # Fallback (not cached): now with local offset if available
     now = datetime.now().astimezone()
     return now.isoformat(timespec="seconds")
 
 
+# uuid4 without a getrandom() syscall and UUID object per call: draw random
+# bytes in bulk and patch the version/variant bits ourselves.
+_RAND_POOL_SIZE = 16 * 8192
+_rand_pool = b""
+_rand_off = 0
+_rand_lock = threading.Lock()   # bundle writer threads draw fullUrl UUIDs too
+
+
+def fast_uuid4() -> str:
+    """Return a random (version 4) UUID string, e.g. for ids and urn:uuid refs."""
+    global _rand_pool, _rand_off
+    with _rand_lock:
+        if _rand_off + 16 > len(_rand_pool):
+            _rand_pool = os.urandom(_RAND_POOL_SIZE)
+            _rand_off = 0
+        b = bytearray(_rand_pool[_rand_off:_rand_off + 16])
+        _rand_off += 16
+    b[6] = (b[6] & 0x0F) | 0x40
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _reset_rand_pool() -> None:
+    # A forked child (--workers) inherits the parent's pool and offset and
+    # would hand out the same ids as its siblings; start it from scratch.
+    global _rand_pool, _rand_off, _rand_lock
+    _rand_pool = b""
+    _rand_off = 0
+    _rand_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rand_pool)
+
+
 def rel_ref(resource_type: str, identifier: str) -> str:
     """Return 'Type/id' if identifier isn't already a reference string."""
     if not identifier:
@@ -119,6 +193,17 @@ BUILTIN_NREQ = {
 NREQ_LIKERT_SYSTEM = "http://example.org/fhir/CodeSystem/nreq-likert-3"
 NREQ_LIKERT_CODE = {1: "disagree", 2: "neutral", 3: "agree"}
 NREQ_LIKERT_DISPLAY = {1: "Mostly disagree", 2: "Not sure", 3: "Mostly agree"}
+NREQ_LEVELS = (1, 2, 3)
+# Shared, read-only Coding per Likert level; answers reference these directly
+# (bundles are never mutated after build, so aliasing is safe).
+NREQ_CODING = {
+    v: {"system": NREQ_LIKERT_SYSTEM, "code": NREQ_LIKERT_CODE[v], "display": NREQ_LIKERT_DISPLAY[v]}
+    for v in NREQ_LEVELS
+}
+# Generated answers are (linkId, answer) pairs; the answer dict is exactly what
+# goes under item.answer, so build_qr groups them without copying.
+Answer = Tuple[str, Dict[str, Any]]
+NREQ_ANSWER = {v: {"valueCoding": NREQ_CODING[v]} for v in NREQ_LEVELS}
 
 BUILTIN_PPNQ = {
   "resourceType": "Questionnaire",
@@ -156,92 +241,131 @@ HEADER_ALIASES = {
     "qr_id": ["qr_id", "questionnaireresponseid", "qrid"],
 }
 
-def pick_ci(row_ci: Dict[str, Any], keys: List[str], default: str = "") -> str:
-    for k in keys:
-        if k in row_ci and str(row_ci[k]).strip():
-            return str(row_ci[k]).strip()
-    return default
+class HeaderRow(NamedTuple):
+    """One header CSV row reduced to the canonical fields (stripped, '' if absent)."""
+    patient: str
+    encounter: str
+    author: str
+    source: str
+    authored: str
+    qr_id: str
+
+
+def resolve_columns(headers: List[str]) -> Dict[str, Optional[int]]:
+    """Map each canonical field to the index of its first alias present in the header."""
+    index = {}
+    for i, h in enumerate(headers):
+        index.setdefault(h, i)
+    return {canon: next((index[a] for a in aliases if a in index), None)
+            for canon, aliases in HEADER_ALIASES.items()}
 
 
 # -----------------------------
 # Answer strategies
 # -----------------------------
 
+def item_link_ids(questionnaire: Dict[str, Any], prefix: str = "") -> Tuple[str, ...]:
+    """Return the top-level item linkIds (optionally only those with a prefix).
+
+    The Questionnaire is fixed for a run, so resolve this once, not per row.
+    """
+    return tuple(
+        it["linkId"] for it in questionnaire.get("item", [])
+        if it.get("linkId") and it["linkId"].startswith(prefix)
+    )
+
+
+@lru_cache(maxsize=16)
+def likert_lut(likert_probs: Tuple[float, float, float]) -> bytes:
+    """256-entry table mapping a random byte to a Likert level 1..3.
+
+    Probabilities are quantized to 1/256 steps (cumulative boundaries rounded).
+    A level with a nonzero probability always keeps at least one slot (taken
+    from the largest bucket), so rare levels are never silently dropped.
+    """
+    b0 = round(likert_probs[0] * 256)
+    b1 = max(b0, min(256, round((likert_probs[0] + likert_probs[1]) * 256)))
+    counts = [b0, b1 - b0, 256 - b1]
+    for i, p in enumerate(likert_probs):
+        if p > 0 and counts[i] == 0:
+            counts[counts.index(max(counts))] -= 1
+            counts[i] = 1
+    lut = b"".join(bytes([level]) * n for level, n in zip(NREQ_LEVELS, counts))
+    assert len(lut) == 256, f"bad Likert table for {likert_probs}: {counts}"
+    return lut
+
+
+def gen_nreq_levels(
+    link_ids: Tuple[str, ...],
+    rng: random.Random,
+    likert_probs: Tuple[float, float, float] = (1/3, 1/3, 1/3),
+) -> bytes:
+    # One random byte per item, mapped through the lookup table in C
+    # (bytes.translate): no per-item Python draw or comparison.
+    return rng.randbytes(len(link_ids)).translate(likert_lut(likert_probs))
+
+
 def gen_nreq_answers(
-    questionnaire: Dict[str, Any],
+    link_ids: Tuple[str, ...],
     rng: random.Random,
     likert_probs: Tuple[float, float, float] = (1/3, 1/3, 1/3),
-) -> List[Dict[str, Any]]:
-    items = [it for it in questionnaire.get("item", []) if it.get("linkId", "").startswith("nreq-q")]
-    answers = []
-    for it in items:
-        r = rng.random()
-        if r < likert_probs[0]:
-            v = 1
-        elif r < likert_probs[0] + likert_probs[1]:
-            v = 2
-        else:
-            v = 3
-        answers.append({
-            "linkId": it["linkId"],
-            "valueCoding": {
-                "system": NREQ_LIKERT_SYSTEM,
-                "code": NREQ_LIKERT_CODE[v],
-                "display": NREQ_LIKERT_DISPLAY[v],
-            }
-        })
-    return answers
+) -> List[Answer]:
+    levels = gen_nreq_levels(link_ids, rng, likert_probs)
+    return [(lid, NREQ_ANSWER[v]) for lid, v in zip(link_ids, levels)]
 
 
 NPS_SYSTEM = "http://example.org/fhir/CodeSystem/nps-scale"
-
-def _dummy_sentence(topic: str, rng: random.Random) -> str:
-    stems = [
-        "Overall, I felt that",
-        "From my perspective,",
-        "In general,",
-        "My experience was that",
-        "I noticed that",
-        "It seemed to me that",
-    ]
-    phrases = [
-        " the team communicated clearly",
-        " the care was well coordinated",
-        " I was listened to and involved",
-        " safety was taken seriously",
-        " my goals were understood",
-        " follow-up plans were consistent",
-        " access was straightforward",
+# Shared, read-only Coding per NPS score 0..10 (see NREQ_CODING)
+NPS_CODING = tuple({"system": NPS_SYSTEM, "code": str(n), "display": str(n)} for n in range(11))
+
+# Dry-run sentence parts (module-level tuples: built once, indexed by rng.choices)
+_STEMS = (
+    "Overall, I felt that",
+    "From my perspective,",
+    "In general,",
+    "My experience was that",
+    "I noticed that",
+    "It seemed to me that",
+)
+_PHRASES = (
+    " the team communicated clearly",
+    " the care was well coordinated",
+    " I was listened to and involved",
+    " safety was taken seriously",
+    " my goals were understood",
+    " follow-up plans were consistent",
+    " access was straightforward",
+)
+# (linkId, sentence suffix) per free-text PPNQ item
+_PPNQ_TOPICS = tuple((lid, f" regarding {topic}.") for lid, topic in (
+    ("ppnq-q1", "access to services"),
+    ("ppnq-q2", "meeting my needs"),
+    ("ppnq-q3a", "seeing the same clinicians"),
+    ("ppnq-q3b", "information sharing across professionals"),
+    ("ppnq-q4", "coordination between specialists"),
+    ("ppnq-q5", "feeling safe during therapies"),
+    ("ppnq-q6", "listening to my preferences"),
+    ("ppnq-q7", "self-management support"),
+    ("ppnq-q8", "trust in the team"),
+))
+
+
+def gen_ppnq_answers_dry(questionnaire: Dict[str, Any], rng: random.Random) -> List[Answer]:
+    # Free-text responses: draw all stems and phrases for the row in two calls
+    k = len(_PPNQ_TOPICS)
+    stems = rng.choices(_STEMS, k=k)
+    phrases = rng.choices(_PHRASES, k=k)
+    answers = [
+        (lid, {"valueString": f"{stem}{phrase}{suffix}"})
+        for (lid, suffix), stem, phrase in zip(_PPNQ_TOPICS, stems, phrases)
     ]
-    return f"{rng.choice(stems)}{rng.choice(phrases)} regarding {topic}."
-
-
-def gen_ppnq_answers_dry(questionnaire: Dict[str, Any], rng: random.Random) -> List[Dict[str, Any]]:
-    topics = {
-        "ppnq-q1": "access to services",
-        "ppnq-q2": "meeting my needs",
-        "ppnq-q3a": "seeing the same clinicians",
-        "ppnq-q3b": "information sharing across professionals",
-        "ppnq-q4": "coordination between specialists",
-        "ppnq-q5": "feeling safe during therapies",
-        "ppnq-q6": "listening to my preferences",
-        "ppnq-q7": "self-management support",
-        "ppnq-q8": "trust in the team",
-    }
-    answers = []
-    # Free-text responses
-    for linkId, topic in topics.items():
-        answers.append({"linkId": linkId, "valueString": _dummy_sentence(topic, rng)})
     # NPS 0..10
     nps = rng.randint(0, 10)
-    answers.append({
-        "linkId": "ppnq-q9",
-        "valueCoding": {"system": NPS_SYSTEM, "code": str(nps), "display": str(nps)}
-    })
+    answers.append(("ppnq-q9", {"valueCoding": NPS_CODING[nps]}))
     reason = "Excellent teamwork and clear goals." if nps >= 9 else (
              "Good care overall but some waits." if nps >= 7 else
              "Several issues affected my experience.")
-    answers.append({"linkId": "ppnq-q9-text", "valueString": reason})
+    answers.append(("ppnq-q9-text", {"valueString": reason}))
     return answers
 
 
@@ -249,99 +373,342 @@ def gen_ppnq_answers_dry(questionnaire: Dict[str, Any], rng: random.Random) -> L
 # QR + Bundle builders
 # -----------------------------
 
+def qr_head(hdr: HeaderRow, questionnaire_url: Optional[str]) -> Dict[str, Any]:
+    """QR fields up to and including ``authored`` (no narrative, no items)."""
+    patient_id = hdr.patient
+    encounter_id = hdr.encounter
+    author_id = hdr.author
+    source_id = hdr.source or patient_id
+    authored = to_fhir_datetime(hdr.authored)
+    qr_id = hdr.qr_id or fast_uuid4()
+
+    # Insert optional keys in place rather than filtering None out afterwards
+    qr: Dict[str, Any] = {
+        "resourceType": "QuestionnaireResponse",
+        "id": qr_id,
+        "status": "completed",
+    }
+    if questionnaire_url:
+        qr["questionnaire"] = questionnaire_url
+    if patient_id:
+        qr["subject"] = {"reference": rel_ref("Patient", patient_id)}
+    if encounter_id:
+        qr["encounter"] = {"reference": rel_ref("Encounter", encounter_id)}
+    if author_id:
+        qr["author"] = {"reference": rel_ref("Practitioner", author_id)}
+    if source_id:
+        qr["source"] = {"reference": rel_ref("Patient", source_id)}
+    qr["authored"] = authored
+    return qr
+
+
+def _narr_nreq(lid: str, a: Dict[str, Any]) -> str:
+    # NREQ answers are always Likert codings
+    coding = a["valueCoding"]
+    return f"{lid}: {coding.get('display') or coding.get('code')}"
+
+
+def _narr_ppnq(lid: str, a: Dict[str, Any]) -> str:
+    if "valueCoding" in a:
+        return _narr_nreq(lid, a)
+    return f"{lid}: {a.get('valueString', '')[:80]}"
+
+
 def build_qr(
     mode: str,
-    row_ci: Dict[str, Any],
-    questionnaire: Dict[str, Any],
+    hdr: HeaderRow,
+    q_link_ids: Tuple[str, ...],
     questionnaire_url: Optional[str],
-    answers: List[Dict[str, Any]]
+    answers: List[Answer],
+    narrative: bool = True,
 ) -> Dict[str, Any]:
-    patient_id = pick_ci(row_ci, HEADER_ALIASES["patient"])
-    encounter_id = pick_ci(row_ci, HEADER_ALIASES["encounter"])
-    author_id = pick_ci(row_ci, HEADER_ALIASES["author"])
-    source_id = pick_ci(row_ci, HEADER_ALIASES["source"]) or patient_id
-    authored_str = pick_ci(row_ci, HEADER_ALIASES["authored"])
-    authored = to_fhir_datetime(authored_str)
-    qr_id = pick_ci(row_ci, HEADER_ALIASES["qr_id"]) or str(uuid.uuid4())
-
-    # Build minimal narrative with quick glance of answers
-    def narrative_line(a: Dict[str, Any]) -> str:
-        if "valueCoding" in a:
-            display = a["valueCoding"].get("display") or a["valueCoding"].get("code")
-            return f"{a['linkId']}: {display}"
-        else:
-            s = a.get("valueString", "")[:80]
-            return f"{a['linkId']}: {s}"
-    narrative = "<br/>".join(narrative_line(a) for a in answers)
-
-    qr = {
-        "resourceType": "QuestionnaireResponse",
-        "id": qr_id,
-        "status": "completed",
-        "questionnaire": questionnaire_url or questionnaire.get("url"),
-        "subject": {"reference": rel_ref("Patient", patient_id)} if patient_id else None,
-        "encounter": {"reference": rel_ref("Encounter", encounter_id)} if encounter_id else None,
-        "author": {"reference": rel_ref("Practitioner", author_id)} if author_id else None,
-        "source": {"reference": rel_ref("Patient", source_id)} if source_id else None,
-        "authored": authored,
-        "text": {
+    qr = qr_head(hdr, questionnaire_url)
+    if narrative:
+        # Minimal narrative with a quick glance of the answers
+        narrative_line = _narr_nreq if mode == "nreq" else _narr_ppnq
+        lines = "<br/>".join([narrative_line(lid, a) for lid, a in answers])
+        qr["text"] = {
             "status": "generated",
-            "div": f"<div xmlns='http://www.w3.org/1999/xhtml'><p><b>{mode.upper()} QR</b></p><p>{narrative}</p></div>"
-        },
-        "item": []
-    }
+            "div": f"<div xmlns='http://www.w3.org/1999/xhtml'><p><b>{mode.upper()} QR</b></p><p>{lines}</p></div>"
+        }
 
     # Group answers under items with matching linkId
-    by_link: Dict[str, List[Dict[str, Any]]] = {}
-    for a in answers:
-        by_link.setdefault(a["linkId"], []).append({k: v for k, v in a.items() if k != "linkId"})
+    by_link: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for lid, a in answers:
+        by_link[lid].append(a)
 
-    for it in questionnaire.get("item", []):
-        lid = it.get("linkId")
+    items = qr["item"] = []
+    append_item = items.append
+    for lid in q_link_ids:
         if lid in by_link:
-            qr["item"].append({"linkId": lid, "answer": by_link[lid]})
-    # Remove None keys
-    qr = {k: v for k, v in qr.items() if v is not None}
+            append_item({"linkId": lid, "answer": by_link[lid]})
     return qr
 
 
-def make_entry(resource: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "fullUrl": f"urn:uuid:{uuid.uuid4()}",
-        "resource": resource,
-        "request": {"method": "POST", "url": resource["resourceType"]}
-    }
+def dumps_json(obj: Dict[str, Any], pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (compact, or 2-space indent), via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(obj)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads_json(data) -> Any:
+    """Parse JSON from str or bytes, via orjson when installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
+# A QR dict, or its compact JSON encoding when built from an NreqTemplate
+Resource = Union[Dict[str, Any], bytes]
 
-def write_bundles(resources: List[Dict[str, Any]], out_dir: Path, prefix: str, chunk_size: int = 250) -> List[Path]:
+
+def make_entry(resource: Dict[str, Any], full_url: bool = False) -> Dict[str, Any]:
+    # References are relative to the server, so a urn:uuid fullUrl is only
+    # needed by consumers that insist on one (--full-url).
+    entry: Dict[str, Any] = {"fullUrl": f"urn:uuid:{fast_uuid4()}"} if full_url else {}
+    entry["resource"] = resource
+    entry["request"] = {"method": "POST", "url": resource["resourceType"]}
+    return entry
+
+
+# Output files get a 1 MiB buffer: entries are written as many small pieces
+# (framing, resource, request), so batch them into few large write() calls.
+WRITE_BUFFER = 1 << 20
+
+
+@contextmanager
+def atomic_write(path: Path) -> Iterator[BinaryIO]:
+    """Open ``path.part`` for buffered binary writing; rename onto ``path`` on success.
+
+    On any error or interrupt the part file is removed, so a failed run never
+    leaves a truncated chunk under a name upload_qr.sh would pick up.
+    """
+    part = path.with_name(path.name + ".part")
+    f = part.open("wb", buffering=WRITE_BUFFER)
+    try:
+        yield f
+    except BaseException:
+        f.close()
+        part.unlink(missing_ok=True)
+        raise
+    f.close()
+    os.replace(part, path)
+
+
+class NreqTemplate:
+    """Pre-encoded NREQ items, spliced into each QR's JSON as bytes.
+
+    Every NREQ item is one of three fixed answers, so each (item, level)
+    fragment and narrative line is serialized once at startup. Per row only the
+    small header part goes through the JSON encoder; the output is identical
+    to dumps_json(build_qr(...)) (compact mode only).
+    """
+
+    def __init__(self, link_ids: Tuple[str, ...]):
+        self.link_ids = link_ids
+        self._items = [
+            {v: dumps_json({"linkId": lid, "answer": [{"valueCoding": NREQ_CODING[v]}]}) for v in NREQ_LEVELS}
+            for lid in link_ids
+        ]
+        self._lines = [{v: f"{lid}: {NREQ_LIKERT_DISPLAY[v]}" for v in NREQ_LEVELS} for lid in link_ids]
+
+    @staticmethod
+    def applies(link_ids: Tuple[str, ...], q_link_ids: Tuple[str, ...]) -> bool:
+        # build_qr groups answers by linkId in Questionnaire order; the splice
+        # assumes one answer per item in that same order.
+        return len(set(link_ids)) == len(link_ids) and link_ids == tuple(l for l in q_link_ids if l in link_ids)
+
+    def encode(
+        self,
+        hdr: HeaderRow,
+        questionnaire_url: Optional[str],
+        levels: bytes,
+        narrative: bool = True,
+    ) -> bytes:
+        qr = qr_head(hdr, questionnaire_url)
+        if narrative:
+            lines = "<br/>".join([line[v] for line, v in zip(self._lines, levels)])
+            qr["text"] = {
+                "status": "generated",
+                "div": f"<div xmlns='http://www.w3.org/1999/xhtml'><p><b>NREQ QR</b></p><p>{lines}</p></div>"
+            }
+        items = b",".join([item[v] for item, v in zip(self._items, levels)])
+        return b"".join((dumps_json(qr)[:-1], b',"item":[', items, b"]}"))
+
+
+class ChunkWriter:
+    """Stream one batch Bundle file entry by entry, with manual JSON framing.
+
+    Each entry is serialized and written as soon as it is added, so neither the
+    Bundle dict nor its full JSON string is ever held in memory. The layout is
+    identical to dumping the whole Bundle at once (compact, or indent=2 when
+    pretty).
+    """
+
+    def __init__(self, path: Path, pretty: bool = False):
+        self.path = path
+        self.pretty = pretty
+        self._out = None   # atomic_write context: file appears at path only when complete
+        self._f = None
+        self._count = 0
+        if pretty:
+            self._head = b'{\n  "resourceType": "Bundle",\n  "type": "batch",\n  "entry": ['
+            self._first, self._sep = b"\n    ", b",\n    "
+            self._tail, self._empty_tail = b"\n  ]\n}", b"]\n}"
+        else:
+            self._head = b'{"resourceType":"Bundle","type":"batch","entry":['
+            self._first, self._sep = b"", b","
+            self._tail = self._empty_tail = b"]}"
+
+    def __enter__(self) -> "ChunkWriter":
+        self._out = atomic_write(self.path)
+        self._f = self._out.__enter__()
+        self._f.write(self._head)
+        return self
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self._f.write(self._sep if self._count else self._first)
+        data = dumps_json(entry, self.pretty)
+        if self.pretty:
+            # JSON strings never contain raw newlines, so re-indenting is safe
+            data = data.replace(b"\n", b"\n    ")
+        self._f.write(data)
+        self._count += 1
+
+    def add_encoded(self, resource: bytes, full_url: bool = False) -> None:
+        """Add an entry for an already-encoded compact resource (see NreqTemplate)."""
+        self._f.write(self._sep if self._count else self._first)
+        if full_url:
+            self._f.write(f'{{"fullUrl":"urn:uuid:{fast_uuid4()}","resource":'.encode())
+        else:
+            self._f.write(b'{"resource":')
+        self._f.write(resource)
+        self._f.write(b',"request":{"method":"POST","url":"QuestionnaireResponse"}}')
+        self._count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        if exc_type is None:
+            self._f.write(self._tail if self._count else self._empty_tail)
+        # Commits the part file on success, discards it and re-raises otherwise
+        return self._out.__exit__(exc_type, exc, tb)
+
+
+def chunk_path(out_dir: Path, prefix: str, index: int, ndjson: bool = False) -> Path:
+    """Output file for the 0-based chunk ``index``."""
+    if ndjson:
+        return out_dir / f"{prefix}_{index+1:03d}.ndjson"
+    return out_dir / f"{prefix}_batch_bundle_{index+1:03d}.json"
+
+
+def write_chunk(path: Path, resources: List[Resource], full_url: bool = False, pretty: bool = False) -> Path:
+    # Entries are wrapped and serialized one at a time; no entry list is built
+    with ChunkWriter(path, pretty) as w:
+        for r in resources:
+            if isinstance(r, bytes):
+                w.add_encoded(r, full_url)
+            else:
+                w.add(make_entry(r, full_url))
+    return path
+
+
+def write_ndjson_chunk(path: Path, resources: List[Resource]) -> Path:
+    """Write bare resources, one compact JSON object per line (FHIR bulk NDJSON)."""
+    with atomic_write(path) as f:
+        for r in resources:
+            f.write(r if isinstance(r, bytes) else dumps_json(r))
+            f.write(b"\n")
+    return path
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield consecutive lists of up to ``size`` items from any iterable."""
+    it = iter(items)
+    size = max(1, size)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_map(pool: Executor, fn: Callable[..., Any], tasks: Iterable[Tuple], limit: int) -> Iterator[Any]:
+    """Like pool.map, but with at most ``limit`` tasks in flight.
+
+    Executor.map submits everything up front, which would drain a lazy task
+    iterator (and hold every chunk) before the first result; this does not.
+    Results are yielded in submission order.
+    """
+    pending = deque()
+    for args in tasks:
+        pending.append(pool.submit(fn, *args))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# Chunk files are written on a small thread pool so disk I/O of one chunk
+# overlaps with generating the next.
+WRITE_WORKERS = 4
+
+
+def write_bundles_streaming(
+    resources: Iterable[Resource],
+    out_dir: Path,
+    prefix: str,
+    chunk_size: int = 250,
+    full_url: bool = False,
+    pretty: bool = False,
+    ndjson: bool = False,
+) -> Tuple[List[Path], int]:
+    """Write resources to chunk files (batch Bundles or NDJSON) as they are produced.
+
+    Only the chunks being written are held in memory, so peak memory is
+    O(chunk_size), not O(rows). Returns the written paths and the resource count.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-    paths = []
-    chunks = math.ceil(len(resources) / max(1, chunk_size))
-    for i in range(chunks):
-        batch = resources[i*chunk_size:(i+1)*chunk_size]
-        bundle = {
-            "resourceType": "Bundle",
-            "type": "batch",
-            "entry": [make_entry(r) for r in batch]
-        }
-        p = out_dir / f"{prefix}_batch_bundle_{i+1:03d}.json"
-        p.write_text(json.dumps(bundle, indent=2), encoding="utf-8")
-        paths.append(p)
-    return paths
+    count = 0
+
+    def tasks() -> Iterator[Tuple]:
+        nonlocal count
+        for i, batch in enumerate(iter_chunks(resources, chunk_size)):
+            count += len(batch)
+            path = chunk_path(out_dir, prefix, i, ndjson)
+            yield (path, batch) if ndjson else (path, batch, full_url, pretty)
+
+    writer = write_ndjson_chunk if ndjson else write_chunk
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        paths = list(bounded_map(pool, writer, tasks(), WRITE_WORKERS))
+    return paths, count
 
 
 # -----------------------------
 # Header ingestion
 # -----------------------------
 
-def read_header_csv(path: Path) -> List[Dict[str, Any]]:
-    delim = detect_delimiter(path)
-    rows: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f, delimiter=delim)
+def read_header_csv(path: Path) -> Iterator[HeaderRow]:
+    """Yield one HeaderRow per non-empty CSV row (lazily; the file stays open until exhausted)."""
+    # One open and one decode pass: sniff the delimiter from the raw head, then
+    # rewind and decode the same handle (utf-8-sig also drops a BOM).
+    with path.open("rb") as raw:
+        delim = sniff_delimiter(raw.read(4096))
+        raw.seek(0)
+        f = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        reader = csv.reader(f, delimiter=delim)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        # Case-insensitive header, resolved to column indices once per file
+        cols = resolve_columns([h.strip().lower() for h in headers])
+        fields = [cols[name] for name in HeaderRow._fields]
         for row in reader:
-            rows.append(normalize_headers(row))
-    return rows
+            if not row:
+                continue
+            n = len(row)
+            yield HeaderRow(*(
+                row[i].strip() if i is not None and i < n else "" for i in fields
+            ))
 
 
 
@@ -355,6 +722,7 @@ class LLMConfig:
     model: str = "gpt-4o-mini"
     temperature: float = 0.6
     max_retries: int = 3
+    concurrency: int = 8   # LLM requests in flight at once
 
 def load_dotenv(path: Path) -> Dict[str, str]:
     """Tiny .env loader: lines like KEY=VALUE; ignores blanks and # comments."""
@@ -372,7 +740,6 @@ def load_dotenv(path: Path) -> Dict[str, str]:
 
 def get_llm_config() -> LLMConfig:
     # precedence: actual environment then .env file; we read os.environ at call time
-    import os
     env_file = Path(".env")
     file_env = load_dotenv(env_file)
     api_key = os.getenv("OPENAI_API_KEY") or file_env.get("OPENAI_API_KEY")
@@ -385,7 +752,12 @@ def get_llm_config() -> LLMConfig:
         max_retries = int(os.getenv("LLM_MAX_RETRIES") or file_env.get("LLM_MAX_RETRIES") or 3)
     except Exception:
         max_retries = 3
-    return LLMConfig(api_key=api_key, model=model, temperature=temperature, max_retries=max_retries)
+    try:
+        concurrency = int(os.getenv("LLM_CONCURRENCY") or file_env.get("LLM_CONCURRENCY") or 8)
+    except Exception:
+        concurrency = 8
+    return LLMConfig(api_key=api_key, model=model, temperature=temperature, max_retries=max_retries,
+                     concurrency=concurrency)
 # -----------------------------
 # LLM generation for PPNQ
 # -----------------------------
@@ -417,13 +789,26 @@ def _ppnq_schema_prompt(questionnaire: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def _ppnq_user_context(row_ci: Dict[str, Any]) -> str:
-    pid = pick_ci(row_ci, HEADER_ALIASES["patient"]) or "unknown"
-    eid = pick_ci(row_ci, HEADER_ALIASES["encounter"]) or "unknown"
-    authored = to_fhir_datetime(pick_ci(row_ci, HEADER_ALIASES["authored"]))
+def _ppnq_user_context(hdr: HeaderRow) -> str:
+    pid = hdr.patient or "unknown"
+    eid = hdr.encounter or "unknown"
+    authored = to_fhir_datetime(hdr.authored)
     return f"Patient={pid} Encounter={eid} Authored={authored}"
 
 
+def _chat_payload(prompt: str, cfg: LLMConfig) -> Dict[str, Any]:
+    """Chat Completions request body (shared by the SDK, async SDK and REST calls)."""
+    return {
+        "model": cfg.model,
+        "messages": [
+            {"role": "system", "content": "You are a careful medical scribe that follows JSON schemas exactly."},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": cfg.temperature,
+        "response_format": {"type": "json_object"},
+    }
+
+
 def _call_openai_json(prompt: str, cfg: LLMConfig) -> Dict[str, Any]:
     """Call OpenAI Chat Completions with JSON output. Requires OPENAI_API_KEY."""
     # Prefer the official client, fallback to requests
@@ -431,40 +816,24 @@ def _call_openai_json(prompt: str, cfg: LLMConfig) -> Dict[str, Any]:
         from openai import OpenAI
         client = OpenAI()
         # Newer SDK supports response_format={"type":"json_object"}
-        resp = client.chat.completions.create(
-            model=cfg.model,
-            messages=[
-                {"role": "system", "content": "You are a careful medical scribe that follows JSON schemas exactly."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=cfg.temperature,
-            response_format={"type": "json_object"},
-        )
+        resp = client.chat.completions.create(**_chat_payload(prompt, cfg))
         content = resp.choices[0].message.content
-        return json.loads(content)
+        return loads_json(content)
     except Exception as e:
         # Minimal fallback using raw REST if openai package not available
-        import os, time, requests
+        import time, requests
         api_key = cfg.api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not set and the OpenAI SDK is unavailable.") from e
         url = "https://api.openai.com/v1/chat/completions"
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        payload = {
-            "model": cfg.model,
-            "messages": [
-                {"role": "system", "content": "You are a careful medical scribe that follows JSON schemas exactly."},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": cfg.temperature,
-            "response_format": {"type": "json_object"},
-        }
+        payload = _chat_payload(prompt, cfg)
         for attempt in range(cfg.max_retries):
             r = requests.post(url, headers=headers, json=payload, timeout=60)
             if r.status_code == 200:
                 try:
                     content = r.json()["choices"][0]["message"]["content"]
-                    return json.loads(content)
+                    return loads_json(content)
                 except Exception:
                     pass
             # basic backoff
@@ -472,7 +841,7 @@ def _call_openai_json(prompt: str, cfg: LLMConfig) -> Dict[str, Any]:
         raise RuntimeError(f"OpenAI REST call failed after {cfg.max_retries} attempts: {r.status_code} {r.text}")
 
 
-def _validate_ppnq_answers(obj: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _validate_ppnq_answers(obj: Dict[str, Any]) -> List[Answer]:
     if not isinstance(obj, dict) or "answers" not in obj or not isinstance(obj["answers"], list):
         raise ValueError("LLM output must be a JSON object with an 'answers' array.")
     out = []
@@ -485,22 +854,22 @@ def _validate_ppnq_answers(obj: Dict[str, Any]) -> List[Dict[str, Any]]:
             continue
         seen.add(linkId)
         if "valueString" in a and isinstance(a["valueString"], str):
-            out.append({"linkId": linkId, "valueString": a["valueString"]})
+            out.append((linkId, {"valueString": a["valueString"]}))
         elif "valueCoding" in a and isinstance(a["valueCoding"], dict):
             vc = a["valueCoding"]
             sys_ = vc.get("system") or NPS_SYSTEM
             code = str(vc.get("code"))
             disp = str(vc.get("display") or code)
-            out.append({"linkId": linkId, "valueCoding": {"system": sys_, "code": code, "display": disp}})
+            out.append((linkId, {"valueCoding": {"system": sys_, "code": code, "display": disp}}))
     # Ensure required set
     req = {"ppnq-q1","ppnq-q2","ppnq-q3a","ppnq-q3b","ppnq-q4","ppnq-q5","ppnq-q6","ppnq-q7","ppnq-q8","ppnq-q9","ppnq-q9-text"}
-    got = {a["linkId"] for a in out}
+    got = {lid for lid, _ in out}
     missing = sorted(req - got)
     if missing:
         raise ValueError("Missing required answers: " + ", ".join(missing))
     # Coerce NPS to be 0..10 if present
-    for a in out:
-        if a["linkId"] == "ppnq-q9" and "valueCoding" in a:
+    for lid, a in out:
+        if lid == "ppnq-q9" and "valueCoding" in a:
             try:
                 nps = int(a["valueCoding"]["code"])
                 nps = max(0, min(10, nps))
@@ -512,10 +881,17 @@ def _validate_ppnq_answers(obj: Dict[str, Any]) -> List[Dict[str, Any]]:
     return out
 
 
-def gen_ppnq_answers_llm(questionnaire: Dict[str, Any], row_ci: Dict[str, Any], cfg: LLMConfig) -> List[Dict[str, Any]]:
-    prompt = _ppnq_schema_prompt(questionnaire) + "\n\n" + _ppnq_user_context(row_ci)
+def gen_ppnq_answers_llm(
+    questionnaire: Dict[str, Any],
+    hdr: HeaderRow,
+    cfg: LLMConfig,
+    schema_prompt: Optional[str] = None,
+) -> List[Answer]:
+    if schema_prompt is None:
+        schema_prompt = _ppnq_schema_prompt(questionnaire)
+    prompt = schema_prompt + "\n\n" + _ppnq_user_context(hdr)
     last_err = None
-    for _ in range(max(1, args.max_retries)):
+    for _ in range(max(1, cfg.max_retries)):
         try:
             obj = _call_openai_json(prompt, cfg)
             return _validate_ppnq_answers(obj)
@@ -523,16 +899,95 @@ def gen_ppnq_answers_llm(questionnaire: Dict[str, Any], row_ci: Dict[str, Any],
             last_err = e
     raise last_err if last_err else RuntimeError("Unknown LLM error")
 
+
+async def _gen_ppnq_answers_llm_async(
+    questionnaire: Dict[str, Any],
+    hdr: HeaderRow,
+    cfg: LLMConfig,
+    schema_prompt: str,
+    client: Any,
+    sem: asyncio.Semaphore,
+) -> List[Answer]:
+    async with sem:
+        if client is None:
+            # No async SDK: run the sync path (SDK or REST fallback) off-loop
+            return await asyncio.to_thread(gen_ppnq_answers_llm, questionnaire, hdr, cfg, schema_prompt)
+        prompt = schema_prompt + "\n\n" + _ppnq_user_context(hdr)
+        last_err = None
+        for _ in range(max(1, cfg.max_retries)):
+            try:
+                resp = await client.chat.completions.create(**_chat_payload(prompt, cfg))
+                return _validate_ppnq_answers(loads_json(resp.choices[0].message.content))
+            except Exception as e:
+                last_err = e
+        raise last_err if last_err else RuntimeError("Unknown LLM error")
+
+
+def gen_ppnq_answers_llm_many(
+    questionnaire: Dict[str, Any],
+    rows: List[HeaderRow],
+    cfg: LLMConfig,
+    schema_prompt: Optional[str] = None,
+) -> List[List[Answer]]:
+    """Generate LLM answers for many rows with up to cfg.concurrency calls in flight.
+
+    The API round-trip, not CPU, dominates; results keep the order of ``rows``.
+    """
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:
+        AsyncOpenAI = None
+
+    # The schema block depends only on the (run-invariant) questionnaire
+    if schema_prompt is None:
+        schema_prompt = _ppnq_schema_prompt(questionnaire)
+
+    async def run() -> List[List[Answer]]:
+        sem = asyncio.Semaphore(max(1, cfg.concurrency))
+        client = AsyncOpenAI(api_key=cfg.api_key) if AsyncOpenAI is not None else None
+        try:
+            return await asyncio.gather(*(
+                _gen_ppnq_answers_llm_async(questionnaire, hdr, cfg, schema_prompt, client, sem)
+                for hdr in rows
+            ))
+        finally:
+            if client is not None:
+                await client.close()
+
+    return asyncio.run(run())
+
 # -----------------------------
 # Main flow
 # -----------------------------
 
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Run settings, resolved once from the CLI and passed to the pipeline helpers."""
+    mode: str
+    out_dir: Path
+    questionnaire_url: Optional[str] = None
+    chunk_size: int = 250
+    seed: Optional[int] = None
+    likert_probs: Tuple[float, float, float] = (1/3, 1/3, 1/3)
+    narrative: bool = True
+    full_url: bool = False
+    pretty: bool = False
+    ndjson: bool = False
+    workers: int = 1
+    use_llm: bool = False
+
+    @property
+    def prefix(self) -> str:
+        return self.mode
+
 def parse_likert_dist(s: Optional[str]) -> Tuple[float, float, float]:
     if not s:
         return (1/3, 1/3, 1/3)
     parts = [float(x) for x in s.split(",")]
     if len(parts) != 3:
         raise ValueError("--likert-dist must be three comma-separated numbers e.g. 0.2,0.5,0.3")
+    if not all(0 <= x < float("inf") for x in parts):   # also rejects nan
+        raise ValueError("--likert-dist values must be non-negative finite numbers")
     total = sum(parts)
     if total <= 0:
         raise ValueError("likert distribution must sum to > 0")
@@ -541,7 +996,7 @@ def parse_likert_dist(s: Optional[str]) -> Tuple[float, float, float]:
 
 def load_questionnaire(args) -> Dict[str, Any]:
     if args.questionnaire_file:
-        q = json.loads(Path(args.questionnaire_file).read_text(encoding="utf-8"))
+        q = loads_json(Path(args.questionnaire_file).read_bytes())
     else:
         q = BUILTIN_NREQ if args.mode == "nreq" else BUILTIN_PPNQ
     # If a URL override is provided, apply it
@@ -551,6 +1006,107 @@ def load_questionnaire(args) -> Dict[str, Any]:
     return q
 
 
+def iter_qrs(
+    mode: str,
+    rows: Iterable[HeaderRow],
+    questionnaire: Dict[str, Any],
+    questionnaire_url: Optional[str],
+    rng: random.Random,
+    likert_probs: Tuple[float, float, float],
+    narrative: bool = True,
+    encoded: bool = False,
+) -> Iterator[Resource]:
+    """Yield one QR per header row with generated (NREQ / PPNQ dry-run) answers.
+
+    With ``encoded``, NREQ QRs are yielded as compact JSON bytes built from an
+    NreqTemplate instead of dicts (only valid for compact output).
+    """
+    q_link_ids = item_link_ids(questionnaire)
+    # Hot per-row loop: bind callables to locals once
+    build = build_qr
+    if mode == "nreq":
+        link_ids = item_link_ids(questionnaire, "nreq-q")
+        if encoded and NreqTemplate.applies(link_ids, q_link_ids):
+            encode = NreqTemplate(link_ids).encode
+            gen_levels = gen_nreq_levels
+            for hdr in rows:
+                yield encode(hdr, questionnaire_url, gen_levels(link_ids, rng, likert_probs), narrative)
+            return
+        gen_answers = gen_nreq_answers
+        for hdr in rows:
+            answers = gen_answers(link_ids, rng, likert_probs)
+            yield build("nreq", hdr, q_link_ids, questionnaire_url, answers, narrative)
+    else:
+        gen_answers = gen_ppnq_answers_dry
+        for hdr in rows:
+            answers = gen_answers(questionnaire, rng)
+            yield build("ppnq", hdr, q_link_ids, questionnaire_url, answers, narrative)
+
+
+def iter_llm_qrs(
+    rows: Iterable[HeaderRow],
+    questionnaire: Dict[str, Any],
+    questionnaire_url: Optional[str],
+    cfg: LLMConfig,
+    narrative: bool = True,
+    batch_size: int = 250,
+) -> Iterator[Dict[str, Any]]:
+    """Yield PPNQ QRs with LLM answers, one concurrent batch of rows at a time."""
+    q_link_ids = item_link_ids(questionnaire)
+    schema_prompt = _ppnq_schema_prompt(questionnaire)
+    for batch in iter_chunks(rows, batch_size):
+        answer_sets = gen_ppnq_answers_llm_many(questionnaire, batch, cfg, schema_prompt)
+        for hdr, answers in zip(batch, answer_sets):
+            yield build_qr("ppnq", hdr, q_link_ids, questionnaire_url, answers, narrative)
+
+
+def _build_and_write_chunk(
+    index: int,
+    rows: List[HeaderRow],
+    questionnaire: Dict[str, Any],
+    settings: Settings,
+) -> Path:
+    """Process-pool task: generate one chunk of QRs and write its file directly.
+
+    Each chunk gets its own RNG (seed + index), so output is reproducible for a
+    given seed regardless of worker count; only the file path is sent back.
+    """
+    st = settings
+    rng = random.Random(None if st.seed is None else st.seed + index)
+    resources = list(iter_qrs(st.mode, rows, questionnaire, st.questionnaire_url, rng, st.likert_probs,
+                              st.narrative, encoded=not st.pretty))
+    path = chunk_path(st.out_dir, st.prefix, index, st.ndjson)
+    if st.ndjson:
+        return write_ndjson_chunk(path, resources)
+    return write_chunk(path, resources, st.full_url, st.pretty)
+
+
+def write_parallel(
+    header_rows: Iterable[HeaderRow],
+    questionnaire: Dict[str, Any],
+    settings: Settings,
+) -> Tuple[List[Path], int]:
+    """Fan chunks of header rows out to settings.workers processes (see _build_and_write_chunk).
+
+    Rows are read lazily; at most two chunks per worker are queued at a time.
+    Returns the written paths and the row count.
+    """
+    settings.out_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+
+    def tasks() -> Iterator[Tuple[int, List[HeaderRow]]]:
+        nonlocal count
+        for i, rows in enumerate(iter_chunks(header_rows, settings.chunk_size)):
+            count += len(rows)
+            yield i, rows
+
+    workers = settings.workers
+    task = partial(_build_and_write_chunk, questionnaire=questionnaire, settings=settings)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        paths = list(bounded_map(pool, task, tasks(), 2 * workers))
+    return paths, count
+
+
 def main(argv=None) -> int:
     p = argparse.ArgumentParser(description="Synthesize FHIR QuestionnaireResponse Bundles")
     p.add_argument("--mode", choices=["nreq", "ppnq"], required=True, help="Which questionnaire to synthesize")
@@ -560,9 +1116,19 @@ def main(argv=None) -> int:
     p.add_argument("--questionnaire-file", help="Optional path to Questionnaire JSON to use")
     p.add_argument("--questionnaire-url", help="Override Questionnaire canonical URL in QR.questionnaire")
     p.add_argument("--seed", type=int, default=None, help="Seed for RNG (for reproducible bundles)")
+    p.add_argument("--narrative", action=argparse.BooleanOptionalAction, default=True,
+                   help="Include a generated text.div narrative in each QR (default: on)")
+    p.add_argument("--full-url", action=argparse.BooleanOptionalAction, default=False,
+                   help="Give each Bundle entry a urn:uuid fullUrl (default: off)")
+    p.add_argument("--pretty", action="store_true", help="Indent bundle JSON for humans (default: compact)")
+    p.add_argument("--ndjson", action="store_true",
+                   help="Write bare QRs as NDJSON (one per line) instead of batch Bundles, e.g. for $import")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Generate chunks in N processes (NREQ / PPNQ dry-run; seeds each chunk with seed+index)")
 
     # NREQ-specific
-    p.add_argument("--likert-dist", help="Comma-separated probs for 1,2,3 (e.g., 0.2,0.5,0.3)")
+    p.add_argument("--likert-dist", help="Comma-separated probs for 1,2,3 (e.g., 0.2,0.5,0.3); "
+                   "sampled in 1/256 steps, any nonzero level gets at least 1/256")
 
     # PPNQ behavior
     p.add_argument("--dry-run", action="store_true", help="Generate placeholder text answers for PPNQ")
@@ -572,42 +1138,57 @@ def main(argv=None) -> int:
     args = p.parse_args(argv)
 
     rng = random.Random(args.seed)
+    # Rows stream from the CSV through generation into the chunk writers
     header_rows = read_header_csv(Path(args.csv))
-    if not header_rows:
+    first = next(header_rows, None)
+    if first is None:
         print("No rows found in header CSV.", file=sys.stderr)
         return 2
+    header_rows = chain((first,), header_rows)
 
     questionnaire = load_questionnaire(args)
-    questionnaire_url = args.questionnaire_url or questionnaire.get("url")
-
-    resources: List[Dict[str, Any]] = []
-    prefix = args.mode
-
-    if args.mode == "nreq":
-        likert_probs = parse_likert_dist(args.likert_dist)
-        for row_ci in header_rows:
-            answers = gen_nreq_answers(questionnaire, rng, likert_probs)
-            qr = build_qr("nreq", row_ci, questionnaire, questionnaire_url, answers)
-            resources.append(qr)
-
-    elif args.mode == "ppnq":
-        cfg = get_llm_config()
-        for row_ci in header_rows:
-            if args.llm and not args.dry_run:
-                answers = gen_ppnq_answers_llm(questionnaire, row_ci, cfg)
-            else:
-                answers = gen_ppnq_answers_dry(questionnaire, rng)
-            qr = build_qr("ppnq", row_ci, questionnaire, questionnaire_url, answers)
-            resources.append(qr)
+    settings = Settings(
+        mode=args.mode,
+        out_dir=Path(args.out),
+        questionnaire_url=args.questionnaire_url or questionnaire.get("url"),
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        likert_probs=parse_likert_dist(args.likert_dist) if args.mode == "nreq" else (1/3, 1/3, 1/3),
+        narrative=args.narrative,
+        full_url=args.full_url,
+        pretty=args.pretty,
+        ndjson=args.ndjson,
+        workers=args.workers,
+        use_llm=args.mode == "ppnq" and args.llm and not args.dry_run,
+    )
+    st = settings
+
+    if st.workers > 1 and not st.use_llm:
+        paths, n_created = write_parallel(header_rows, questionnaire, st)
+    else:
+        if st.use_llm:
+            # LLM calls are I/O-bound and already concurrent (LLM_CONCURRENCY)
+            resources = iter_llm_qrs(header_rows, questionnaire, st.questionnaire_url, get_llm_config(),
+                                     st.narrative, st.chunk_size)
+        else:
+            resources = iter_qrs(st.mode, header_rows, questionnaire, st.questionnaire_url,
+                                 rng, st.likert_probs, st.narrative, encoded=not st.pretty)
+        paths, n_created = write_bundles_streaming(
+            resources, st.out_dir, st.prefix, st.chunk_size, st.full_url, st.pretty, st.ndjson,
+        )
 
-    paths = write_bundles(resources, Path(args.out), prefix, args.chunk_size)
+    if st.ndjson:
+        print(f"Created {n_created} QuestionnaireResponses in {len(paths)} NDJSON file(s):")
+        for pth in paths:
+            print(f" - {pth}")
+        return 0
 
-    print(f"Created {len(resources)} QuestionnaireResponses in {len(paths)} bundle file(s):")
+    print(f"Created {n_created} QuestionnaireResponses in {len(paths)} bundle file(s):")
     for pth in paths:
         print(f" - {pth}")
     print("\nExample POST using curl (change FHIR_BASE):")
     print("  FHIR_BASE='https://your-fhir-server.example/fhir'")
-    print(f"  for f in {Path(args.out) / (prefix + '_batch_bundle_*.json')}; do")
+    print(f"  for f in {st.out_dir / (st.prefix + '_batch_bundle_*.json')}; do")
     print("    curl -sfS -X POST \"$FHIR_BASE\" \\")
     print("      -H 'content-type: application/fhir+json' \\")
     print("      --data-binary @\"$f\" | jq '.type,.total,.issue // empty'")
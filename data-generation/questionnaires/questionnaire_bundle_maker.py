@@ -13,6 +13,8 @@ Options:
                              - auto: PUT if resource has 'id', else POST
                              - put : always PUT (requires 'id')
                              - post: always POST
+  --full-url               : add a urn:uuid fullUrl to every entry (default: off)
+  --pretty                 : indent the output JSON (default: compact)
 """
 
 from __future__ import annotations
@@ -20,8 +22,14 @@ import argparse
 import json
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson  # optional: C-accelerated JSON encoder/decoder
+except ImportError:
+    orjson = None
 
 # resource order for dependency safety
 ORDER = {
@@ -33,11 +41,32 @@ ORDER = {
 ALLOWED = set(ORDER.keys())
 
 
+def _read_bytes(p: Path) -> Tuple[Optional[bytes], Optional[OSError]]:
+    """Read a file for the thread pool: (data, None) on success, (None, error) on failure."""
+    try:
+        return p.read_bytes(), None
+    except OSError as e:
+        return None, e
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Parse JSON from str or bytes, via orjson when installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
 def load_json_files(indir: Path) -> List[Dict[str, Any]]:
     resources: List[Dict[str, Any]] = []
-    for p in sorted(indir.glob("*.json")):
+    paths = sorted(indir.glob("*.json"))
+    # Overlap the many small open/read calls; decoding stays in order below
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        blobs = list(ex.map(_read_bytes, paths))
+
+    for p, (data, err) in zip(paths, blobs):
+        if err is not None:
+            print(f"Skipping {p.name}: could not read file ({err})", file=sys.stderr)
+            continue
         try:
-            obj = json.loads(p.read_text(encoding="utf-8"))
+            obj = loads_json(data)
         except Exception as e:
             print(f"Skipping {p.name}: not valid JSON ({e})", file=sys.stderr)
             continue
@@ -53,9 +82,11 @@ def load_json_files(indir: Path) -> List[Dict[str, Any]]:
 
 
 def sort_resources(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    def key(r: Dict[str, Any]):
-        return (ORDER.get(r.get("resourceType"), 99), r.get("id") or "")
-    return sorted(resources, key=key)
+    # Decorate-sort-undecorate: compute each (order, id) key exactly once
+    decorated = [((ORDER.get(r.get("resourceType"), 99), r.get("id") or ""), i, r)
+                 for i, r in enumerate(resources)]
+    decorated.sort()
+    return [r for _, _, r in decorated]
 
 
 def request_method(resource: Dict[str, Any], mode: str) -> str:
@@ -73,31 +104,42 @@ def request_url(resource: Dict[str, Any]) -> str:
     return f"{rt}/{rid}" if rid else rt
 
 
-def make_entry(resource: Dict[str, Any], mode: str) -> Dict[str, Any]:
-    return {
-        "fullUrl": f"urn:uuid:{uuid.uuid4()}",
-        "resource": resource,
-        "request": {
-            "method": request_method(resource, mode),
-            "url": request_url(resource),
-        },
+def make_entry(resource: Dict[str, Any], mode: str, full_url: bool = False) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"fullUrl": f"urn:uuid:{uuid.uuid4()}"} if full_url else {}
+    entry["resource"] = resource
+    entry["request"] = {
+        "method": request_method(resource, mode),
+        "url": request_url(resource),
     }
+    return entry
 
 
-def build_bundle(resources: List[Dict[str, Any]], mode: str) -> Dict[str, Any]:
+def build_bundle(resources: List[Dict[str, Any]], mode: str, full_url: bool = False) -> Dict[str, Any]:
     return {
         "resourceType": "Bundle",
         "type": "transaction",
-        "entry": [make_entry(r, mode) for r in resources],
+        "entry": [make_entry(r, mode, full_url) for r in resources],
     }
 
 
+def dumps_bundle(bundle: Dict[str, Any], pretty: bool = False) -> bytes:
+    """Serialize a Bundle to UTF-8 JSON bytes (compact, or 2-space indent), via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(bundle, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(bundle)
+    if pretty:
+        return json.dumps(bundle, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(bundle, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
 def main(argv=None) -> int:
     ap = argparse.ArgumentParser(description="Make FHIR transaction Bundle for CodeSystem/ValueSet/Questionnaire")
     ap.add_argument("--in", dest="indir", required=True, help="Input folder containing JSON resources")
     ap.add_argument("--out", dest="outfile", required=True, help="Output file for the transaction Bundle")
     ap.add_argument("--method", choices=["auto", "put", "post"], default="auto",
                     help="How to set Bundle.entry.request.method (default: auto)")
+    ap.add_argument("--full-url", action=argparse.BooleanOptionalAction, default=False,
+                    help="Give each entry a urn:uuid fullUrl (default: off; nothing references them)")
+    ap.add_argument("--pretty", action="store_true", help="Indent the Bundle JSON for humans (default: compact)")
     args = ap.parse_args(argv)
 
     indir = Path(args.indir)
@@ -110,9 +152,9 @@ def main(argv=None) -> int:
         return 2
 
     resources = sort_resources(resources)
-    bundle = build_bundle(resources, args.method)
+    bundle = build_bundle(resources, args.method, args.full_url)
 
-    out.write_text(json.dumps(bundle, indent=2), encoding="utf-8")
+    out.write_bytes(dumps_bundle(bundle, args.pretty))
     print(f"Wrote transaction Bundle with {len(resources)} resources → {out}")
     print("\nPOST it with:")
     print("  FHIR_BASE='http://localhost:8080/fhir' \\")